@@ -0,0 +1,108 @@
+"""
+Import-time and cold-start benchmark for the Moodle learning activities flow.
+
+Every flow run on a process work pool starts a fresh interpreter, so this script
+measures the startup overhead in fresh subprocesses rather than in-process:
+
+- import: interpreter start + `import moodle_learning_activities_flow`
+- cold start: import + first SQL query load + first pandas import (the work a
+  short incremental run does before its first record is processed)
+
+Usage:
+    python bench_startup.py --runs 10 --budget 1.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+FLOW_DIR = Path(__file__).resolve().parent
+
+IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import moodle_learning_activities_flow
+elapsed = time.perf_counter() - start
+print(json.dumps({"import": elapsed, "pandas_loaded": "pandas" in sys.modules}))
+"""
+
+COLD_START_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import moodle_learning_activities_flow as flow_module
+imported = time.perf_counter()
+flow_module.load_sql_query("assignments")
+queries_loaded = time.perf_counter()
+import pandas
+pandas.DataFrame(flow_module.generate_mock_assignment_data(10))
+finished = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "sql_query_load": queries_loaded - imported,
+    "pandas_first_use": finished - queries_loaded,
+    "total": finished - start,
+}))
+"""
+
+
+def run_snippet(snippet: str) -> dict:
+    """Run a snippet in a fresh interpreter and return its JSON result plus wall time"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=FLOW_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_time = time.perf_counter() - start
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_wall"] = wall_time
+    return result
+
+
+def summarize(label: str, samples: list) -> None:
+    """Print the median and worst case for each measured phase"""
+    print(f"\n{label} ({len(samples)} runs)")
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        if isinstance(values[0], bool):
+            print(f"  {key:<18} {all(values)}")
+            continue
+        print(f"  {key:<18} median {statistics.median(values):.3f}s  max {max(values):.3f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters per benchmark")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="maximum median cold-start process time in seconds")
+    args = parser.parse_args()
+
+    import_samples = [run_snippet(IMPORT_SNIPPET) for _ in range(args.runs)]
+    cold_start_samples = [run_snippet(COLD_START_SNIPPET) for _ in range(args.runs)]
+
+    print("=" * 80)
+    print("MOODLE LEARNING ACTIVITIES FLOW - STARTUP BENCHMARK")
+    print("=" * 80)
+    summarize("Module import", import_samples)
+    summarize("Cold start", cold_start_samples)
+
+    if any(sample["pandas_loaded"] for sample in import_samples):
+        print("\n❌ pandas is imported at module import time")
+        return 1
+
+    median_cold_start = statistics.median(sample["process_wall"] for sample in cold_start_samples)
+    if median_cold_start > args.budget:
+        print(f"\n❌ Median cold start {median_cold_start:.3f}s exceeds budget of {args.budget:.3f}s")
+        return 1
+
+    print(f"\n✅ Median cold start {median_cold_start:.3f}s is within budget of {args.budget:.3f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 import random
+import sqlite3
 import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import pandas as pd
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Optional
 from prefect import flow, task, get_run_logger
 from prefect.futures import wait
 
@@ -180,263 +182,29 @@ def generate_mock_other_data(num_records: int = 40) -> List[Dict[str, Any]]:
     return mock_data
 
 
-# SQL Queries for logging and monitoring
-SQL_QUERIES = {
-    "assignments": """
--- Assignment Activities with improved JOIN logic
-SELECT 
-    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
-    CAST(COALESCE(asub.userid, ag.userid) AS CHAR(50)) as lms_la_lms_student_id,
-    CONCAT('assign_', CAST(a.id AS CHAR(20)), '_', CAST(COALESCE(asub.attemptnumber, ag.attemptnumber, 0) AS CHAR(10))) as lms_la_activity_id,
-    'assignment' as lms_la_activity_type,
-    a.name as lms_la_title,
-    CASE 
-        WHEN cm.visible = 1 THEN 'published'
-        WHEN cm.visible = 0 THEN 'unpublished'
-        ELSE 'unknown'
-    END as lms_la_status,
-    CASE WHEN a.timemodified > 0 THEN FROM_UNIXTIME(a.timemodified) ELSE NULL END as lms_la_published_date,
-    CASE WHEN a.allowsubmissionsfromdate > 0 THEN FROM_UNIXTIME(a.allowsubmissionsfromdate) ELSE NULL END as lms_la_unlocked_date,
-    CASE WHEN a.cutoffdate > 0 THEN FROM_UNIXTIME(a.cutoffdate) ELSE NULL END as lms_la_locked_date,
-    CASE WHEN a.duedate > 0 THEN FROM_UNIXTIME(a.duedate) ELSE NULL END as lms_la_due_date,
-    CASE WHEN a.timelimit > 0 THEN ROUND(a.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
-    CASE 
-        WHEN a.attemptreopenmethod = 'manual' THEN 'manual'
-        WHEN a.attemptreopenmethod = 'untilpass' THEN 'until_pass'
-        WHEN a.attemptreopenmethod = 'none' THEN 'single_attempt'
-        ELSE COALESCE(a.attemptreopenmethod, 'single_attempt')
-    END as lms_la_scoring_policy,
-    a.grade as lms_la_points_possible,
-    CASE WHEN a.maxattempts = -1 THEN NULL ELSE a.maxattempts END as lms_la_allowed_attempts,
-    ag.id as lms_la_result_id,
-    ag.grade as lms_la_score,
-    ag.grade as lms_la_kept_score,
-    COALESCE(asub.attemptnumber, ag.attemptnumber, 0) as lms_la_attempt,
-    CASE WHEN ag.timemodified > 0 THEN FROM_UNIXTIME(ag.timemodified) ELSE NULL END as lms_la_grade_viewable,
-    NULL as lms_la_has_seen_results,
-    asub_stats.total_attempts as lms_la_total_attempts,
-    CASE WHEN asub.timestarted > 0 THEN FROM_UNIXTIME(asub.timestarted) ELSE NULL END as lms_la_started_date,
-    CASE WHEN asub.timemodified > 0 THEN FROM_UNIXTIME(asub.timemodified) ELSE NULL END as lms_la_finished_date,
-    CASE 
-        WHEN asub.timestarted > 0 AND asub.timemodified > asub.timestarted 
-        THEN ROUND((asub.timemodified - asub.timestarted) / 60.0, 2)
-        ELSE NULL 
-    END as lms_la_time_taken
-FROM mdl_assign a
-JOIN mdl_course_modules cm ON cm.instance = a.id 
-JOIN mdl_modules m ON m.id = cm.module AND m.name = 'assign'
-JOIN mdl_course c ON c.id = a.course
-LEFT JOIN mdl_assign_submission asub ON asub.assignment = a.id AND asub.latest = 1
-LEFT JOIN mdl_assign_grades ag ON ag.assignment = a.id AND ag.userid = asub.userid AND ag.attemptnumber = asub.attemptnumber
-LEFT JOIN (
-    SELECT assignment, userid, COUNT(*) as total_attempts
-    FROM mdl_assign_submission 
-    GROUP BY assignment, userid
-) asub_stats ON asub_stats.assignment = a.id AND asub_stats.userid = COALESCE(asub.userid, ag.userid)
-WHERE (asub.id IS NOT NULL OR ag.id IS NOT NULL);
-""",
-
-    "quizzes": """
--- Quiz Activities with optimized subqueries
-SELECT 
-    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
-    CAST(qa.userid AS CHAR(50)) as lms_la_lms_student_id,
-    CONCAT('quiz_', CAST(q.id AS CHAR(20)), '_', CAST(qa.attempt AS CHAR(10))) as lms_la_activity_id,
-    'quiz' as lms_la_activity_type,
-    q.name as lms_la_title,
-    CASE 
-        WHEN cm.visible = 1 THEN 'published'
-        WHEN cm.visible = 0 THEN 'unpublished'
-        ELSE 'unknown'
-    END as lms_la_status,
-    CASE WHEN q.timecreated > 0 THEN FROM_UNIXTIME(q.timecreated) ELSE NULL END as lms_la_published_date,
-    CASE WHEN q.timeopen > 0 THEN FROM_UNIXTIME(q.timeopen) ELSE NULL END as lms_la_unlocked_date,
-    CASE WHEN q.timeclose > 0 THEN FROM_UNIXTIME(q.timeclose) ELSE NULL END as lms_la_locked_date,
-    CASE WHEN q.timeclose > 0 THEN FROM_UNIXTIME(q.timeclose) ELSE NULL END as lms_la_due_date,
-    CASE WHEN q.timelimit > 0 THEN ROUND(q.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
-    CASE 
-        WHEN q.grademethod = 1 THEN 'highest'
-        WHEN q.grademethod = 2 THEN 'average'
-        WHEN q.grademethod = 3 THEN 'first'
-        WHEN q.grademethod = 4 THEN 'last'
-        ELSE 'highest'
-    END as lms_la_scoring_policy,
-    q.grade as lms_la_points_possible,
-    CASE WHEN q.attempts = 0 THEN NULL ELSE q.attempts END as lms_la_allowed_attempts,
-    qa.id as lms_la_result_id,
-    qa.sumgrades as lms_la_score,
-    qa_stats.kept_score as lms_la_kept_score,
-    qa.attempt as lms_la_attempt,
-    CASE WHEN qa.timefinish > 0 THEN FROM_UNIXTIME(qa.timefinish) ELSE NULL END as lms_la_grade_viewable,
-    NULL as lms_la_has_seen_results,
-    qa_stats.total_attempts as lms_la_total_attempts,
-    CASE WHEN qa.timestart > 0 THEN FROM_UNIXTIME(qa.timestart) ELSE NULL END as lms_la_started_date,
-    CASE WHEN qa.timefinish > 0 THEN FROM_UNIXTIME(qa.timefinish) ELSE NULL END as lms_la_finished_date,
-    CASE 
-        WHEN qa.timestart > 0 AND qa.timefinish > qa.timestart 
-        THEN ROUND((qa.timefinish - qa.timestart) / 60.0, 2)
-        ELSE NULL 
-    END as lms_la_time_taken
-FROM mdl_quiz q
-JOIN mdl_course_modules cm ON cm.instance = q.id
-JOIN mdl_modules m ON m.id = cm.module AND m.name = 'quiz'
-JOIN mdl_course c ON c.id = q.course
-JOIN mdl_quiz_attempts qa ON qa.quiz = q.id AND qa.state = 'finished'
-LEFT JOIN (
-    SELECT qa2.quiz, qa2.userid, COUNT(*) as total_attempts,
-           CASE 
-               WHEN MAX(CASE WHEN q2.grademethod = 1 THEN qa2.sumgrades END) IS NOT NULL THEN MAX(qa2.sumgrades)
-               WHEN MAX(CASE WHEN q2.grademethod = 2 THEN qa2.sumgrades END) IS NOT NULL THEN AVG(qa2.sumgrades)
-               WHEN MAX(CASE WHEN q2.grademethod = 3 THEN qa2.sumgrades END) IS NOT NULL THEN MIN(qa2.sumgrades)
-               WHEN MAX(CASE WHEN q2.grademethod = 4 THEN qa2.sumgrades END) IS NOT NULL THEN MAX(qa2.sumgrades)
-               ELSE MAX(qa2.sumgrades)
-           END as kept_score
-    FROM mdl_quiz_attempts qa2
-    JOIN mdl_quiz q2 ON q2.id = qa2.quiz
-    WHERE qa2.state = 'finished'
-    GROUP BY qa2.quiz, qa2.userid
-) qa_stats ON qa_stats.quiz = q.id AND qa_stats.userid = qa.userid;
-""",
-
-    "lessons": """
--- Lesson Activities with improved performance
-SELECT 
-    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
-    CAST(lg.userid AS CHAR(50)) as lms_la_lms_student_id,
-    CONCAT('lesson_', CAST(l.id AS CHAR(20)), '_', CAST(COALESCE(lesson_stats.max_retry, 0) AS CHAR(10))) as lms_la_activity_id,
-    'lesson' as lms_la_activity_type,
-    l.name as lms_la_title,
-    CASE 
-        WHEN cm.visible = 1 THEN 'published'
-        WHEN cm.visible = 0 THEN 'unpublished'
-        ELSE 'unknown'
-    END as lms_la_status,
-    CASE WHEN l.available > 0 THEN FROM_UNIXTIME(l.available) ELSE NULL END as lms_la_published_date,
-    CASE WHEN l.available > 0 THEN FROM_UNIXTIME(l.available) ELSE NULL END as lms_la_unlocked_date,
-    CASE WHEN l.deadline > 0 THEN FROM_UNIXTIME(l.deadline) ELSE NULL END as lms_la_locked_date,
-    CASE WHEN l.deadline > 0 THEN FROM_UNIXTIME(l.deadline) ELSE NULL END as lms_la_due_date,
-    CASE WHEN l.timelimit > 0 THEN ROUND(l.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
-    CASE 
-        WHEN l.retake = 1 THEN 'retake_allowed'
-        ELSE 'single_attempt'
-    END as lms_la_scoring_policy,
-    l.grade as lms_la_points_possible,
-    CASE WHEN l.retake = 1 THEN NULL ELSE 1 END as lms_la_allowed_attempts,
-    lg.id as lms_la_result_id,
-    lg.grade as lms_la_score,
-    lg.grade as lms_la_kept_score,
-    COALESCE(lesson_stats.max_retry, 0) + 1 as lms_la_attempt,
-    CASE WHEN lg.completed > 0 THEN FROM_UNIXTIME(lg.completed) ELSE NULL END as lms_la_grade_viewable,
-    NULL as lms_la_has_seen_results,
-    COALESCE(lesson_stats.total_attempts, 1) as lms_la_total_attempts,
-    CASE WHEN lesson_stats.first_attempt > 0 THEN FROM_UNIXTIME(lesson_stats.first_attempt) ELSE NULL END as lms_la_started_date,
-    CASE WHEN lg.completed > 0 THEN FROM_UNIXTIME(lg.completed) ELSE NULL END as lms_la_finished_date,
-    CASE 
-        WHEN lesson_stats.first_attempt > 0 AND lg.completed > lesson_stats.first_attempt 
-        THEN ROUND((lg.completed - lesson_stats.first_attempt) / 60.0, 2)
-        ELSE NULL 
-    END as lms_la_time_taken
-FROM mdl_lesson l
-JOIN mdl_course_modules cm ON cm.instance = l.id
-JOIN mdl_modules m ON m.id = cm.module AND m.name = 'lesson'
-JOIN mdl_course c ON c.id = l.course
-JOIN mdl_lesson_grades lg ON lg.lessonid = l.id
-LEFT JOIN (
-    SELECT lessonid, userid, 
-           MAX(retry) as max_retry,
-           COUNT(DISTINCT retry) as total_attempts,
-           MIN(timeseen) as first_attempt
-    FROM mdl_lesson_attempts
-    GROUP BY lessonid, userid
-) lesson_stats ON lesson_stats.lessonid = l.id AND lesson_stats.userid = lg.userid;
-""",
-
-    "h5p": """
--- H5P Activities with standardized structure
-SELECT 
-    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
-    CAST(ha.userid AS CHAR(50)) as lms_la_lms_student_id,
-    CONCAT('h5p_', CAST(h.id AS CHAR(20)), '_', CAST(ha.attempt AS CHAR(10))) as lms_la_activity_id,
-    'h5p' as lms_la_activity_type,
-    h.name as lms_la_title,
-    CASE 
-        WHEN cm.visible = 1 THEN 'published'
-        WHEN cm.visible = 0 THEN 'unpublished'
-        ELSE 'unknown'
-    END as lms_la_status,
-    CASE WHEN h.timecreated > 0 THEN FROM_UNIXTIME(h.timecreated) ELSE NULL END as lms_la_published_date,
-    NULL as lms_la_unlocked_date,
-    NULL as lms_la_locked_date,
-    NULL as lms_la_due_date,
-    NULL as lms_la_time_limit,
-    'keep_highest' as lms_la_scoring_policy,
-    h.grade as lms_la_points_possible,
-    NULL as lms_la_allowed_attempts,
-    ha.id as lms_la_result_id,
-    ha.rawscore as lms_la_score,
-    ha_stats.kept_score as lms_la_kept_score,
-    ha.attempt as lms_la_attempt,
-    CASE WHEN ha.timemodified > 0 THEN FROM_UNIXTIME(ha.timemodified) ELSE NULL END as lms_la_grade_viewable,
-    NULL as lms_la_has_seen_results,
-    ha_stats.total_attempts as lms_la_total_attempts,
-    CASE WHEN ha.timecreated > 0 THEN FROM_UNIXTIME(ha.timecreated) ELSE NULL END as lms_la_started_date,
-    CASE WHEN ha.timemodified > 0 THEN FROM_UNIXTIME(ha.timemodified) ELSE NULL END as lms_la_finished_date,
-    CASE WHEN ha.duration > 0 THEN ROUND(ha.duration / 60.0, 2) ELSE NULL END as lms_la_time_taken
-FROM mdl_h5pactivity h
-JOIN mdl_course_modules cm ON cm.instance = h.id
-JOIN mdl_modules m ON m.id = cm.module AND m.name = 'h5pactivity'
-JOIN mdl_course c ON c.id = h.course
-JOIN mdl_h5pactivity_attempts ha ON ha.h5pactivityid = h.id
-LEFT JOIN (
-    SELECT h5pactivityid, userid, COUNT(*) as total_attempts, MAX(rawscore) as kept_score
-    FROM mdl_h5pactivity_attempts
-    GROUP BY h5pactivityid, userid
-) ha_stats ON ha_stats.h5pactivityid = h.id AND ha_stats.userid = ha.userid;
-""",
-
-    "other_activities": """
--- Other Gradeable Activities with better filtering
-SELECT 
-    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
-    CAST(gg.userid AS CHAR(50)) as lms_la_lms_student_id,
-    CONCAT(COALESCE(gi.itemmodule, 'unknown'), '_', CAST(gi.iteminstance AS CHAR(20)), '_', CAST(gg.userid AS CHAR(20))) as lms_la_activity_id,
-    COALESCE(gi.itemmodule, 'unknown') as lms_la_activity_type,
-    COALESCE(gi.itemname, 'Unnamed Activity') as lms_la_title,
-    CASE 
-        WHEN cm.visible = 1 THEN 'published'
-        WHEN cm.visible = 0 THEN 'unpublished'
-        ELSE 'unknown'
-    END as lms_la_status,
-    CASE WHEN gi.timecreated > 0 THEN FROM_UNIXTIME(gi.timecreated) ELSE NULL END as lms_la_published_date,
-    NULL as lms_la_unlocked_date,
-    NULL as lms_la_locked_date,
-    NULL as lms_la_due_date,
-    NULL as lms_la_time_limit,
-    NULL as lms_la_scoring_policy,
-    gi.grademax as lms_la_points_possible,
-    NULL as lms_la_allowed_attempts,
-    gg.id as lms_la_result_id,
-    gg.finalgrade as lms_la_score,
-    gg.finalgrade as lms_la_kept_score,
-    1 as lms_la_attempt,
-    CASE WHEN gg.timemodified > 0 THEN FROM_UNIXTIME(gg.timemodified) ELSE NULL END as lms_la_grade_viewable,
-    NULL as lms_la_has_seen_results,
-    1 as lms_la_total_attempts,
-    CASE WHEN gg.timecreated > 0 THEN FROM_UNIXTIME(gg.timecreated) ELSE NULL END as lms_la_started_date,
-    CASE WHEN gg.timemodified > 0 THEN FROM_UNIXTIME(gg.timemodified) ELSE NULL END as lms_la_finished_date,
-    NULL as lms_la_time_taken
-FROM mdl_grade_items gi
-JOIN mdl_grade_grades gg ON gg.itemid = gi.id
-JOIN mdl_course c ON c.id = gi.courseid
-LEFT JOIN mdl_course_modules cm ON cm.instance = gi.iteminstance 
-LEFT JOIN mdl_modules m ON m.id = cm.module AND m.name = gi.itemmodule
-WHERE gi.itemtype = 'mod' 
-  AND gi.itemmodule IS NOT NULL
-  AND gi.itemmodule NOT IN ('assign', 'quiz', 'lesson', 'h5pactivity', 'scorm') 
-  AND gg.finalgrade IS NOT NULL
-  AND gg.finalgrade > 0;
-"""
-}
+# SQL Queries for logging and monitoring, stored as sql/<name>.sql and read on first use
+SQL_DIR = Path(__file__).resolve().with_name("sql")
+SQL_QUERY_NAMES = ("assignments", "quizzes", "lessons", "h5p", "other_activities")
+
+
+@lru_cache(maxsize=None)
+def load_sql_query(name: str) -> str:
+    """Load a single SQL query definition from the sql directory"""
+    if name not in SQL_QUERY_NAMES:
+        raise KeyError(f"Unknown SQL query: {name}")
+    return (SQL_DIR / f"{name}.sql").read_text()
+
+
+def load_sql_queries() -> Dict[str, str]:
+    """Load all SQL query definitions, keyed by query name"""
+    return {name: load_sql_query(name) for name in SQL_QUERY_NAMES}
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `SQL_QUERIES` available as a module attribute without reading it at import time
+    if name == "SQL_QUERIES":
+        return load_sql_queries()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @task(name="Extract Assignment Data",
@@ -448,7 +216,7 @@ def extract_assignment_data() -> List[Dict[str, Any]]:
     # Log the SQL query being executed
     logger.info("🔍 SQL Query for Assignment Data:")
     logger.info("=" * 80)
-    logger.info(SQL_QUERIES["assignments"])
+    logger.info(load_sql_query("assignments"))
     logger.info("=" * 80)
 
     # Random sleep to simulate database query execution time
@@ -472,7 +240,7 @@ def extract_quiz_data() -> List[Dict[str, Any]]:
     # Log the SQL query being executed
     logger.info("🔍 SQL Query for Quiz Data:")
     logger.info("=" * 80)
-    logger.info(SQL_QUERIES["quizzes"])
+    logger.info(load_sql_query("quizzes"))
     logger.info("=" * 80)
 
     sleep_time = random.uniform(3, 10)
@@ -494,7 +262,7 @@ def extract_lesson_data() -> List[Dict[str, Any]]:
     # Log the SQL query being executed
     logger.info("🔍 SQL Query for Lesson Data:")
     logger.info("=" * 80)
-    logger.info(SQL_QUERIES["lessons"])
+    logger.info(load_sql_query("lessons"))
     logger.info("=" * 80)
 
     sleep_time = random.uniform(1, 6)
@@ -516,7 +284,7 @@ def extract_h5p_data() -> List[Dict[str, Any]]:
     # Log the SQL query being executed
     logger.info("🔍 SQL Query for H5P Data:")
     logger.info("=" * 80)
-    logger.info(SQL_QUERIES["h5p"])
+    logger.info(load_sql_query("h5p"))
     logger.info("=" * 80)
 
     sleep_time = random.uniform(1, 5)
@@ -538,7 +306,7 @@ def extract_other_activities_data() -> List[Dict[str, Any]]:
     # Log the SQL query being executed
     logger.info("🔍 SQL Query for Other Activities Data:")
     logger.info("=" * 80)
-    logger.info(SQL_QUERIES["other_activities"])
+    logger.info(load_sql_query("other_activities"))
     logger.info("=" * 80)
 
     sleep_time = random.uniform(1, 4)
@@ -551,8 +319,191 @@ def extract_other_activities_data() -> List[Dict[str, Any]]:
     return data
 
 
+# Declarative data-quality rules. Each check is a vectorized column expression over one
+# batch that returns a boolean Series marking violating rows; `columns` are kept in samples.
+NUMERIC_COLUMNS = ("lms_la_score", "lms_la_points_possible", "lms_la_attempt", "lms_la_total_attempts")
+DATE_COLUMNS = ("lms_la_started_date", "lms_la_finished_date")
+
+VALIDATION_RULES: Dict[str, Dict[str, Any]] = {
+    "null_score": {
+        "description": "Score is missing",
+        "columns": ["lms_la_score"],
+        "check": lambda df, ctx: df["lms_la_score"].isna(),
+    },
+    "null_title": {
+        "description": "Title is missing",
+        "columns": ["lms_la_title"],
+        "check": lambda df, ctx: df["lms_la_title"].isna(),
+    },
+    "duplicate_activity_student": {
+        "description": "Activity id and student pair already seen for this activity source",
+        "columns": ["lms_la_activity_id", "lms_la_lms_student_id"],
+        # Set membership per row keeps each batch's lookup proportional to the batch size
+        "check": lambda df, ctx: (
+            df["row_key"].duplicated() | df["row_key"].map(ctx["seen_row_keys"].__contains__).astype(bool)
+        ),
+    },
+    "score_above_points_possible": {
+        "description": "Score is greater than the points possible",
+        "columns": ["lms_la_score", "lms_la_points_possible"],
+        "check": lambda df, ctx: df["lms_la_score"] > df["lms_la_points_possible"],
+    },
+    "finished_before_started": {
+        "description": "Finished date is before the started date",
+        "columns": ["lms_la_started_date", "lms_la_finished_date"],
+        "check": lambda df, ctx: df["lms_la_finished_date"] < df["lms_la_started_date"],
+    },
+    "attempt_above_total_attempts": {
+        "description": "Attempt number is greater than the total attempts",
+        "columns": ["lms_la_attempt", "lms_la_total_attempts"],
+        "check": lambda df, ctx: df["lms_la_attempt"] > df["lms_la_total_attempts"],
+    },
+    "orphan_course_id": {
+        "description": "Course id is missing or not a known course",
+        "columns": ["lms_la_lms_course_id"],
+        "check": lambda df, ctx: df["lms_la_lms_course_id"].isna() | (
+            ~df["lms_la_lms_course_id"].isin(ctx["known_course_ids"])
+            if ctx["known_course_ids"] is not None else False
+        ),
+    },
+}
+
+
+def evaluate_validation_rules(
+        records: List[Dict[str, Any]],
+        source: str,
+        known_course_ids: Optional[List[str]] = None,
+        batch_size: int = 100_000,
+        sample_size: int = 5
+) -> Dict[str, Any]:
+    """Evaluate every validation rule batch by batch and collect per-rule counts and violation samples"""
+    import pandas as pd
+
+    ctx = {
+        "seen_row_keys": set(),
+        "known_course_ids": set(known_course_ids) if known_course_ids is not None else None,
+    }
+    seen_activity_ids = set()
+    duplicate_activity_ids = 0
+    rule_counts = {rule_name: 0 for rule_name in VALIDATION_RULES}
+    samples = {rule_name: [] for rule_name in VALIDATION_RULES}
+
+    for offset in range(0, len(records), batch_size):
+        raw = pd.DataFrame(records[offset:offset + batch_size])
+        # Coerce typed columns once per batch so every rule compares numbers and timestamps;
+        # utc=True lets offset-aware and naive values share a batch instead of raising
+        df = raw.assign(
+            **{column: pd.to_numeric(raw[column], errors="coerce") for column in NUMERIC_COLUMNS},
+            **{column: pd.to_datetime(raw[column], errors="coerce", format="ISO8601", utc=True)
+               for column in DATE_COLUMNS},
+            row_key=raw["lms_la_activity_id"].astype(str) + "|" + raw["lms_la_lms_student_id"].astype(str)
+        )
+
+        for rule_name, rule in VALIDATION_RULES.items():
+            mask = rule["check"](df, ctx)
+            count = int(mask.sum())
+            if not count:
+                continue
+            rule_counts[rule_name] += count
+            remaining = sample_size - len(samples[rule_name])
+            if remaining > 0:
+                columns = list(dict.fromkeys(["lms_la_activity_id", *rule["columns"]]))
+                sample = raw.loc[mask, columns].head(remaining)
+                samples[rule_name].extend(sample.astype(object).where(sample.notna(), None).to_dict("records"))
+
+        # Legacy `duplicate_activity_ids` counter: activity ids are prefixed by their source,
+        # so per-source counts sum to the old count over the combined dataset
+        activity_ids = raw["lms_la_activity_id"]
+        duplicate_activity_ids += int(
+            (activity_ids.duplicated() | activity_ids.map(seen_activity_ids.__contains__).astype(bool)).sum()
+        )
+        seen_activity_ids.update(activity_ids)
+        ctx["seen_row_keys"].update(df["row_key"])
+
+    return {
+        "source": source,
+        "rows_validated": len(records),
+        "rule_counts": rule_counts,
+        "duplicate_activity_ids": duplicate_activity_ids,
+        "samples": samples
+    }
+
+
+@task(name="Validate Activity Data",
+      description="Evaluate data-quality rules over one activity source in batches")
+def validate_activity_data(
+        records: List[Dict[str, Any]],
+        source: str,
+        known_course_ids: Optional[List[str]] = None,
+        batch_size: int = 100_000,
+        sample_size: int = 5
+) -> Dict[str, Any]:
+    """Validate one activity source against every rule in VALIDATION_RULES"""
+    logger = get_run_logger()
+
+    logger.info(f"🔎 Validating {len(records)} {source} records against {len(VALIDATION_RULES)} rules...")
+
+    result = evaluate_validation_rules(records, source, known_course_ids, batch_size, sample_size)
+
+    total_violations = sum(result["rule_counts"].values())
+    logger.info(f"✅ {source} validation completed: {total_violations} rule violations")
+
+    return result
+
+
+@task(name="Publish Data Quality Report",
+      description="Merge per-source validation results and publish them as an artifact")
+def publish_data_quality_report(validation_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge validation results and write per-rule counts and violation samples as a markdown artifact"""
+    logger = get_run_logger()
+    from prefect.artifacts import create_markdown_artifact
+
+    rule_counts = {rule_name: 0 for rule_name in VALIDATION_RULES}
+    for result in validation_results:
+        for rule_name, count in result["rule_counts"].items():
+            rule_counts[rule_name] += count
+
+    sources = [result["source"] for result in validation_results]
+    lines = [
+        "# Moodle Learning Activities Data Quality",
+        "",
+        f"Rows validated: {sum(result['rows_validated'] for result in validation_results)}",
+        "",
+        "| Rule | Description | Total | " + " | ".join(sources) + " |",
+        "|---|---|---|" + "---|" * len(sources),
+    ]
+    for rule_name, rule in VALIDATION_RULES.items():
+        per_source = " | ".join(str(result["rule_counts"][rule_name]) for result in validation_results)
+        lines.append(f"| {rule_name} | {rule['description']} | {rule_counts[rule_name]} | {per_source} |")
+
+    lines += ["", "## Violation Samples", ""]
+    for result in validation_results:
+        for rule_name, rows in result["samples"].items():
+            for row in rows:
+                lines.append(f"- **{rule_name}** ({result['source']}): `{row}`")
+
+    create_markdown_artifact(
+        key="moodle-data-quality",
+        markdown="\n".join(lines),
+        description="Per-rule violation counts and samples for the Moodle learning activities extraction"
+    )
+    logger.info(f"📋 Data quality report published: {rule_counts}")
+
+    return {
+        "rule_counts": rule_counts,
+        # Counters published before the rule engine existed, kept under their original keys
+        "legacy_checks": {
+            "null_scores": rule_counts["null_score"],
+            "null_titles": rule_counts["null_title"],
+            "duplicate_activity_ids": sum(result["duplicate_activity_ids"] for result in validation_results)
+        },
+        "per_source": {result["source"]: result["rule_counts"] for result in validation_results},
+        "samples": {result["source"]: result["samples"] for result in validation_results}
+    }
+
+
 @task(name="Combine and Process Data",
-      description="Combine all extracted activity data and perform data quality checks")
+      description="Combine all extracted activity data and generate summary statistics")
 def combine_and_process_data(
         assignments: List[Dict[str, Any]],
         quizzes: List[Dict[str, Any]],
@@ -568,7 +519,9 @@ def combine_and_process_data(
     # Combine all data
     all_data = assignments + quizzes + lessons + h5p + others
 
-    # Convert to DataFrame for analysis
+    # Convert to DataFrame for analysis; pandas is imported here so worker startup doesn't pay for it
+    import pandas as pd
+
     df = pd.DataFrame(all_data)
 
     # Generate summary statistics
@@ -585,12 +538,7 @@ def combine_and_process_data(
             "mean": df['lms_la_score'].mean(),
             "median": df['lms_la_score'].median()
         },
-        "extraction_timestamp": datetime.now().isoformat(),
-        "data_quality_checks": {
-            "null_scores": df['lms_la_score'].isnull().sum(),
-            "null_titles": df['lms_la_title'].isnull().sum(),
-            "duplicate_activity_ids": df['lms_la_activity_id'].duplicated().sum()
-        }
+        "extraction_timestamp": datetime.now().isoformat()
     }
 
     logger.info(f"✅ Data processing completed. Total records: {summary['total_records']}")
@@ -599,16 +547,269 @@ def combine_and_process_data(
     return {
         "data": all_data,
         "summary": summary,
-        "sql_queries": SQL_QUERIES
+        "sql_queries": load_sql_queries()
+    }
+
+
+# Materialised rollups served from a local SQLite store. activity_facts keeps each row's last
+# contribution so a run only applies deltas for new, changed or removed rows to the rollup tables.
+ROLLUP_DB_PATH = str(Path(__file__).resolve().with_name("moodle_rollups.db"))
+# Seconds a connection waits for an overlapping run's write lock before raising "database is locked"
+ROLLUP_LOCK_TIMEOUT = 60.0
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_facts (
+    activity_id TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    course_id TEXT,
+    activity_type TEXT,
+    score REAL,
+    completed INTEGER NOT NULL,
+    attempt INTEGER,
+    PRIMARY KEY (activity_id, student_id)
+);
+CREATE TABLE IF NOT EXISTS course_rollup (
+    course_id TEXT PRIMARY KEY,
+    activity_count INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS student_rollup (
+    student_id TEXT NOT NULL,
+    activity_type TEXT NOT NULL,
+    activity_count INTEGER NOT NULL,
+    completed_count INTEGER NOT NULL,
+    PRIMARY KEY (student_id, activity_type)
+);
+CREATE TABLE IF NOT EXISTS activity_type_rollup (
+    activity_type TEXT PRIMARY KEY,
+    activity_count INTEGER NOT NULL,
+    attempt_sum INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_count INTEGER NOT NULL
+);
+"""
+
+ROLLUP_DELTA_SQL = """
+CREATE TEMP TABLE rollup_delta AS
+SELECT -1 AS sign, f.activity_id, f.student_id, f.course_id, f.activity_type, f.score, f.completed, f.attempt
+FROM activity_facts f
+JOIN staged_facts s ON s.activity_id = f.activity_id AND s.student_id = f.student_id
+WHERE f.course_id IS NOT s.course_id OR f.activity_type IS NOT s.activity_type
+   OR f.score IS NOT s.score OR f.completed IS NOT s.completed OR f.attempt IS NOT s.attempt
+UNION ALL
+SELECT 1 AS sign, s.activity_id, s.student_id, s.course_id, s.activity_type, s.score, s.completed, s.attempt
+FROM staged_facts s
+LEFT JOIN activity_facts f ON f.activity_id = s.activity_id AND f.student_id = s.student_id
+WHERE f.activity_id IS NULL
+   OR f.course_id IS NOT s.course_id OR f.activity_type IS NOT s.activity_type
+   OR f.score IS NOT s.score OR f.completed IS NOT s.completed OR f.attempt IS NOT s.attempt;
+"""
+
+# Facts missing from a full extraction were deleted at the source, so their contribution is retracted
+ROLLUP_RETRACT_SQL = """
+INSERT INTO rollup_delta (sign, activity_id, student_id, course_id, activity_type, score, completed, attempt)
+SELECT -1, f.activity_id, f.student_id, f.course_id, f.activity_type, f.score, f.completed, f.attempt
+FROM activity_facts f
+LEFT JOIN staged_facts s ON s.activity_id = f.activity_id AND s.student_id = f.student_id
+WHERE s.activity_id IS NULL;
+"""
+
+ROLLUP_APPLY_SQL = """
+INSERT INTO course_rollup (course_id, activity_count, score_sum, score_count)
+SELECT COALESCE(course_id, 'unknown'), SUM(sign), SUM(sign * COALESCE(score, 0)), SUM(sign * (score IS NOT NULL))
+FROM rollup_delta WHERE true GROUP BY 1
+ON CONFLICT (course_id) DO UPDATE SET
+    activity_count = activity_count + excluded.activity_count,
+    score_sum = score_sum + excluded.score_sum,
+    score_count = score_count + excluded.score_count;
+
+INSERT INTO student_rollup (student_id, activity_type, activity_count, completed_count)
+SELECT student_id, COALESCE(activity_type, 'unknown'), SUM(sign), SUM(sign * completed)
+FROM rollup_delta WHERE true GROUP BY 1, 2
+ON CONFLICT (student_id, activity_type) DO UPDATE SET
+    activity_count = activity_count + excluded.activity_count,
+    completed_count = completed_count + excluded.completed_count;
+
+INSERT INTO activity_type_rollup (activity_type, activity_count, attempt_sum, score_sum, score_count)
+SELECT COALESCE(activity_type, 'unknown'), SUM(sign), SUM(sign * COALESCE(attempt, 0)),
+       SUM(sign * COALESCE(score, 0)), SUM(sign * (score IS NOT NULL))
+FROM rollup_delta WHERE true GROUP BY 1
+ON CONFLICT (activity_type) DO UPDATE SET
+    activity_count = activity_count + excluded.activity_count,
+    attempt_sum = attempt_sum + excluded.attempt_sum,
+    score_sum = score_sum + excluded.score_sum,
+    score_count = score_count + excluded.score_count;
+
+DELETE FROM course_rollup WHERE activity_count <= 0;
+DELETE FROM student_rollup WHERE activity_count <= 0;
+DELETE FROM activity_type_rollup WHERE activity_count <= 0;
+
+DELETE FROM activity_facts
+WHERE (activity_id, student_id) IN (SELECT activity_id, student_id FROM rollup_delta WHERE sign = -1);
+
+INSERT INTO activity_facts (activity_id, student_id, course_id, activity_type, score, completed, attempt)
+SELECT activity_id, student_id, course_id, activity_type, score, completed, attempt
+FROM rollup_delta WHERE sign = 1;
+
+DROP TABLE rollup_delta;
+DROP TABLE staged_facts;
+"""
+
+
+def connect_rollup_store(db_path: str = ROLLUP_DB_PATH) -> sqlite3.Connection:
+    """Open the rollup store for writing, creating its tables on first use"""
+    conn = sqlite3.connect(db_path, timeout=ROLLUP_LOCK_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(ROLLUP_SCHEMA)
+    return conn
+
+
+def _connect_rollup_reader(db_path: str) -> sqlite3.Connection:
+    """Open an existing rollup store read-only; a missing store raises instead of being created"""
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True, timeout=ROLLUP_LOCK_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _to_fact(record: Dict[str, Any]) -> tuple:
+    """Reduce an activity record to the fields the rollup tables aggregate"""
+    score = record.get('lms_la_score')
+    attempt = record.get('lms_la_attempt')
+    return (
+        record['lms_la_activity_id'],
+        record['lms_la_lms_student_id'],
+        record.get('lms_la_lms_course_id'),
+        record.get('lms_la_activity_type'),
+        float(score) if score is not None else None,
+        int(record.get('lms_la_finished_date') is not None),
+        int(attempt) if attempt is not None else None
+    )
+
+
+def apply_rollup_update(
+        conn: sqlite3.Connection,
+        records: List[Dict[str, Any]],
+        full_extraction: bool = True
+) -> Dict[str, int]:
+    """Stage records and apply the deltas for new, changed and (on full extractions) removed rows"""
+    with conn:
+        # Take the write lock before reading activity_facts so overlapping runs queue instead of
+        # deadlocking on a SHARED -> RESERVED upgrade; staging tables are rolled back with it on failure
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DROP TABLE IF EXISTS temp.staged_facts")
+        conn.execute("DROP TABLE IF EXISTS temp.rollup_delta")
+        conn.execute(
+            "CREATE TEMP TABLE staged_facts AS SELECT activity_id, student_id, course_id, activity_type, "
+            "score, completed, attempt FROM activity_facts WHERE 0"
+        )
+        conn.execute("CREATE UNIQUE INDEX temp.staged_facts_key ON staged_facts (activity_id, student_id)")
+        conn.executemany(
+            "INSERT OR REPLACE INTO staged_facts VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (_to_fact(record) for record in records
+             if record.get('lms_la_activity_id') is not None and record.get('lms_la_lms_student_id') is not None)
+        )
+        staged_rows = conn.execute("SELECT COUNT(*) FROM staged_facts").fetchone()[0]
+        conn.execute(ROLLUP_DELTA_SQL)
+        changed_rows = conn.execute("SELECT COUNT(*) FROM rollup_delta WHERE sign = 1").fetchone()[0]
+        removed_rows = conn.execute(ROLLUP_RETRACT_SQL).rowcount if full_extraction else 0
+        for statement in ROLLUP_APPLY_SQL.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+
+    return {
+        "changed_rows": changed_rows,
+        "unchanged_rows": staged_rows - changed_rows,
+        "removed_rows": removed_rows
+    }
+
+
+@task(name="Update Rollup Tables",
+      description="Incrementally update per-course, per-student and per-activity-type rollups")
+def update_rollup_tables(
+        records: List[Dict[str, Any]],
+        db_path: str = ROLLUP_DB_PATH,
+        full_extraction: bool = True
+) -> Dict[str, Any]:
+    """
+    Apply the rows that changed since the last run to the materialised rollup tables.
+
+    When `full_extraction` is True the records are the complete dataset, so stored facts
+    that no longer appear are retracted; pass False for partial (incremental) extractions.
+    """
+    logger = get_run_logger()
+
+    logger.info(f"🗄️ Updating rollup tables in {db_path} from {len(records)} records...")
+
+    conn = connect_rollup_store(db_path)
+    try:
+        counts = apply_rollup_update(conn, records, full_extraction)
+    finally:
+        conn.close()
+
+    logger.info(
+        f"✅ Rollup tables updated: {counts['changed_rows']} new or changed rows, "
+        f"{counts['removed_rows']} removed rows")
+
+    return {"db_path": db_path, **counts}
+
+
+def get_course_rollup(course_id: str, db_path: str = ROLLUP_DB_PATH) -> Optional[Dict[str, Any]]:
+    """Look up the activity count and average score for a course"""
+    conn = _connect_rollup_reader(db_path)
+    try:
+        row = conn.execute(
+            "SELECT course_id, activity_count, score_count, "
+            "CASE WHEN score_count > 0 THEN score_sum / score_count END AS average_score "
+            "FROM course_rollup WHERE course_id = ?",
+            (course_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
+def get_student_rollup(student_id: str, db_path: str = ROLLUP_DB_PATH) -> Dict[str, Dict[str, int]]:
+    """Look up activity and completion counts per activity type for a student"""
+    conn = _connect_rollup_reader(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT activity_type, activity_count, completed_count FROM student_rollup WHERE student_id = ?",
+            (student_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return {
+        row['activity_type']: {"activity_count": row['activity_count'], "completed_count": row['completed_count']}
+        for row in rows
     }
 
 
+def get_activity_type_rollup(activity_type: str, db_path: str = ROLLUP_DB_PATH) -> Optional[Dict[str, Any]]:
+    """Look up the activity count, average attempts and average score for an activity type"""
+    conn = _connect_rollup_reader(db_path)
+    try:
+        row = conn.execute(
+            "SELECT activity_type, activity_count, "
+            "CAST(attempt_sum AS REAL) / activity_count AS average_attempts, "
+            "CASE WHEN score_count > 0 THEN score_sum / score_count END AS average_score "
+            "FROM activity_type_rollup WHERE activity_type = ?",
+            (activity_type,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return dict(row) if row else None
+
+
 @flow(
     name="Moodle Learning Activities Data Pipeline - Concurrent",
     description="Concurrent extraction and processing of Moodle learning activities data using submit()",
     log_prints=True
 )
-def moodle_learning_activities_flow() -> Dict[str, Any]:
+def moodle_learning_activities_flow(
+        known_course_ids: Optional[List[str]] = None,
+        rollup_db_path: str = ROLLUP_DB_PATH
+) -> Dict[str, Any]:
     """
     Main flow for extracting Moodle learning activities data using concurrent execution with submit().
 
@@ -618,6 +819,13 @@ def moodle_learning_activities_flow() -> Dict[str, Any]:
     - Mock data generation for testing and development
     - Comprehensive activity type coverage (assignments, quizzes, lessons, H5P, others)
     - Data quality checks and summary statistics
+    - Parallel rule-based validation per activity type, published as an artifact
+    - Incrementally maintained per-course, per-student and per-activity-type rollups
+
+    Args:
+        known_course_ids: Course ids that activity rows may reference; when omitted,
+            only missing course ids are reported as orphans
+        rollup_db_path: SQLite file holding the materialised rollup tables for dashboards
     """
     logger = get_run_logger()
 
@@ -637,6 +845,19 @@ def moodle_learning_activities_flow() -> Dict[str, Any]:
     h5p_future = extract_h5p_data.submit()
     others_future = extract_other_activities_data.submit()
 
+    # Validate each activity source as soon as its extraction finishes
+    logger.info("🔎 Submitting concurrent data validation tasks...")
+    validation_futures = [
+        validate_activity_data.submit(future, source, known_course_ids)
+        for source, future in [
+            ("assignments", assignments_future),
+            ("quizzes", quizzes_future),
+            ("lessons", lessons_future),
+            ("h5p", h5p_future),
+            ("other_activities", others_future),
+        ]
+    ]
+
     # Wait for all futures to complete and get results
     logger.info("⏳ Waiting for all extraction tasks to complete...")
 
@@ -658,6 +879,17 @@ def moodle_learning_activities_flow() -> Dict[str, Any]:
         others_data
     )
 
+    # Refresh the dashboard rollups from rows that changed since the last run
+    result['rollup_update'] = update_rollup_tables(result['data'], rollup_db_path)
+
+    result['data_quality_report'] = publish_data_quality_report(
+        [future.result() for future in validation_futures]
+    )
+    result['summary']['data_quality_checks'] = {
+        **result['data_quality_report']['legacy_checks'],
+        **result['data_quality_report']['rule_counts']
+    }
+
     execution_time = time.time() - start_time
 
     logger.info(f"🎉 Pipeline completed successfully in {execution_time:.2f} seconds!")
@@ -696,6 +928,11 @@ if __name__ == "__main__":
     stats = result['summary']['score_statistics']
     print(f"  Average Score: {stats['mean']:.2f}")
     print(f"  Score Range: {stats['min']:.2f} - {stats['max']:.2f}")
+    print("\nData Quality Rule Violations:")
+    for rule_name, count in result['data_quality_report']['rule_counts'].items():
+        print(f"  {rule_name}: {count}")
+    print(f"\nRollup Tables: {result['rollup_update']['changed_rows']} new or changed rows and "
+          f"{result['rollup_update']['removed_rows']} removed rows applied to {result['rollup_update']['db_path']}")
     print("=" * 80)
 
     # Display SQL queries that were logged
@@ -0,0 +1,51 @@
+-- Assignment Activities with improved JOIN logic
+SELECT 
+    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
+    CAST(COALESCE(asub.userid, ag.userid) AS CHAR(50)) as lms_la_lms_student_id,
+    CONCAT('assign_', CAST(a.id AS CHAR(20)), '_', CAST(COALESCE(asub.attemptnumber, ag.attemptnumber, 0) AS CHAR(10))) as lms_la_activity_id,
+    'assignment' as lms_la_activity_type,
+    a.name as lms_la_title,
+    CASE 
+        WHEN cm.visible = 1 THEN 'published'
+        WHEN cm.visible = 0 THEN 'unpublished'
+        ELSE 'unknown'
+    END as lms_la_status,
+    CASE WHEN a.timemodified > 0 THEN FROM_UNIXTIME(a.timemodified) ELSE NULL END as lms_la_published_date,
+    CASE WHEN a.allowsubmissionsfromdate > 0 THEN FROM_UNIXTIME(a.allowsubmissionsfromdate) ELSE NULL END as lms_la_unlocked_date,
+    CASE WHEN a.cutoffdate > 0 THEN FROM_UNIXTIME(a.cutoffdate) ELSE NULL END as lms_la_locked_date,
+    CASE WHEN a.duedate > 0 THEN FROM_UNIXTIME(a.duedate) ELSE NULL END as lms_la_due_date,
+    CASE WHEN a.timelimit > 0 THEN ROUND(a.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
+    CASE 
+        WHEN a.attemptreopenmethod = 'manual' THEN 'manual'
+        WHEN a.attemptreopenmethod = 'untilpass' THEN 'until_pass'
+        WHEN a.attemptreopenmethod = 'none' THEN 'single_attempt'
+        ELSE COALESCE(a.attemptreopenmethod, 'single_attempt')
+    END as lms_la_scoring_policy,
+    a.grade as lms_la_points_possible,
+    CASE WHEN a.maxattempts = -1 THEN NULL ELSE a.maxattempts END as lms_la_allowed_attempts,
+    ag.id as lms_la_result_id,
+    ag.grade as lms_la_score,
+    ag.grade as lms_la_kept_score,
+    COALESCE(asub.attemptnumber, ag.attemptnumber, 0) as lms_la_attempt,
+    CASE WHEN ag.timemodified > 0 THEN FROM_UNIXTIME(ag.timemodified) ELSE NULL END as lms_la_grade_viewable,
+    NULL as lms_la_has_seen_results,
+    asub_stats.total_attempts as lms_la_total_attempts,
+    CASE WHEN asub.timestarted > 0 THEN FROM_UNIXTIME(asub.timestarted) ELSE NULL END as lms_la_started_date,
+    CASE WHEN asub.timemodified > 0 THEN FROM_UNIXTIME(asub.timemodified) ELSE NULL END as lms_la_finished_date,
+    CASE 
+        WHEN asub.timestarted > 0 AND asub.timemodified > asub.timestarted 
+        THEN ROUND((asub.timemodified - asub.timestarted) / 60.0, 2)
+        ELSE NULL 
+    END as lms_la_time_taken
+FROM mdl_assign a
+JOIN mdl_course_modules cm ON cm.instance = a.id 
+JOIN mdl_modules m ON m.id = cm.module AND m.name = 'assign'
+JOIN mdl_course c ON c.id = a.course
+LEFT JOIN mdl_assign_submission asub ON asub.assignment = a.id AND asub.latest = 1
+LEFT JOIN mdl_assign_grades ag ON ag.assignment = a.id AND ag.userid = asub.userid AND ag.attemptnumber = asub.attemptnumber
+LEFT JOIN (
+    SELECT assignment, userid, COUNT(*) as total_attempts
+    FROM mdl_assign_submission 
+    GROUP BY assignment, userid
+) asub_stats ON asub_stats.assignment = a.id AND asub_stats.userid = COALESCE(asub.userid, ag.userid)
+WHERE (asub.id IS NOT NULL OR ag.id IS NOT NULL);
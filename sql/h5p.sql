@@ -0,0 +1,40 @@
+-- H5P Activities with standardized structure
+SELECT 
+    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
+    CAST(ha.userid AS CHAR(50)) as lms_la_lms_student_id,
+    CONCAT('h5p_', CAST(h.id AS CHAR(20)), '_', CAST(ha.attempt AS CHAR(10))) as lms_la_activity_id,
+    'h5p' as lms_la_activity_type,
+    h.name as lms_la_title,
+    CASE 
+        WHEN cm.visible = 1 THEN 'published'
+        WHEN cm.visible = 0 THEN 'unpublished'
+        ELSE 'unknown'
+    END as lms_la_status,
+    CASE WHEN h.timecreated > 0 THEN FROM_UNIXTIME(h.timecreated) ELSE NULL END as lms_la_published_date,
+    NULL as lms_la_unlocked_date,
+    NULL as lms_la_locked_date,
+    NULL as lms_la_due_date,
+    NULL as lms_la_time_limit,
+    'keep_highest' as lms_la_scoring_policy,
+    h.grade as lms_la_points_possible,
+    NULL as lms_la_allowed_attempts,
+    ha.id as lms_la_result_id,
+    ha.rawscore as lms_la_score,
+    ha_stats.kept_score as lms_la_kept_score,
+    ha.attempt as lms_la_attempt,
+    CASE WHEN ha.timemodified > 0 THEN FROM_UNIXTIME(ha.timemodified) ELSE NULL END as lms_la_grade_viewable,
+    NULL as lms_la_has_seen_results,
+    ha_stats.total_attempts as lms_la_total_attempts,
+    CASE WHEN ha.timecreated > 0 THEN FROM_UNIXTIME(ha.timecreated) ELSE NULL END as lms_la_started_date,
+    CASE WHEN ha.timemodified > 0 THEN FROM_UNIXTIME(ha.timemodified) ELSE NULL END as lms_la_finished_date,
+    CASE WHEN ha.duration > 0 THEN ROUND(ha.duration / 60.0, 2) ELSE NULL END as lms_la_time_taken
+FROM mdl_h5pactivity h
+JOIN mdl_course_modules cm ON cm.instance = h.id
+JOIN mdl_modules m ON m.id = cm.module AND m.name = 'h5pactivity'
+JOIN mdl_course c ON c.id = h.course
+JOIN mdl_h5pactivity_attempts ha ON ha.h5pactivityid = h.id
+LEFT JOIN (
+    SELECT h5pactivityid, userid, COUNT(*) as total_attempts, MAX(rawscore) as kept_score
+    FROM mdl_h5pactivity_attempts
+    GROUP BY h5pactivityid, userid
+) ha_stats ON ha_stats.h5pactivityid = h.id AND ha_stats.userid = ha.userid;
@@ -0,0 +1,50 @@
+-- Lesson Activities with improved performance
+SELECT 
+    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
+    CAST(lg.userid AS CHAR(50)) as lms_la_lms_student_id,
+    CONCAT('lesson_', CAST(l.id AS CHAR(20)), '_', CAST(COALESCE(lesson_stats.max_retry, 0) AS CHAR(10))) as lms_la_activity_id,
+    'lesson' as lms_la_activity_type,
+    l.name as lms_la_title,
+    CASE 
+        WHEN cm.visible = 1 THEN 'published'
+        WHEN cm.visible = 0 THEN 'unpublished'
+        ELSE 'unknown'
+    END as lms_la_status,
+    CASE WHEN l.available > 0 THEN FROM_UNIXTIME(l.available) ELSE NULL END as lms_la_published_date,
+    CASE WHEN l.available > 0 THEN FROM_UNIXTIME(l.available) ELSE NULL END as lms_la_unlocked_date,
+    CASE WHEN l.deadline > 0 THEN FROM_UNIXTIME(l.deadline) ELSE NULL END as lms_la_locked_date,
+    CASE WHEN l.deadline > 0 THEN FROM_UNIXTIME(l.deadline) ELSE NULL END as lms_la_due_date,
+    CASE WHEN l.timelimit > 0 THEN ROUND(l.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
+    CASE 
+        WHEN l.retake = 1 THEN 'retake_allowed'
+        ELSE 'single_attempt'
+    END as lms_la_scoring_policy,
+    l.grade as lms_la_points_possible,
+    CASE WHEN l.retake = 1 THEN NULL ELSE 1 END as lms_la_allowed_attempts,
+    lg.id as lms_la_result_id,
+    lg.grade as lms_la_score,
+    lg.grade as lms_la_kept_score,
+    COALESCE(lesson_stats.max_retry, 0) + 1 as lms_la_attempt,
+    CASE WHEN lg.completed > 0 THEN FROM_UNIXTIME(lg.completed) ELSE NULL END as lms_la_grade_viewable,
+    NULL as lms_la_has_seen_results,
+    COALESCE(lesson_stats.total_attempts, 1) as lms_la_total_attempts,
+    CASE WHEN lesson_stats.first_attempt > 0 THEN FROM_UNIXTIME(lesson_stats.first_attempt) ELSE NULL END as lms_la_started_date,
+    CASE WHEN lg.completed > 0 THEN FROM_UNIXTIME(lg.completed) ELSE NULL END as lms_la_finished_date,
+    CASE 
+        WHEN lesson_stats.first_attempt > 0 AND lg.completed > lesson_stats.first_attempt 
+        THEN ROUND((lg.completed - lesson_stats.first_attempt) / 60.0, 2)
+        ELSE NULL 
+    END as lms_la_time_taken
+FROM mdl_lesson l
+JOIN mdl_course_modules cm ON cm.instance = l.id
+JOIN mdl_modules m ON m.id = cm.module AND m.name = 'lesson'
+JOIN mdl_course c ON c.id = l.course
+JOIN mdl_lesson_grades lg ON lg.lessonid = l.id
+LEFT JOIN (
+    SELECT lessonid, userid, 
+           MAX(retry) as max_retry,
+           COUNT(DISTINCT retry) as total_attempts,
+           MIN(timeseen) as first_attempt
+    FROM mdl_lesson_attempts
+    GROUP BY lessonid, userid
+) lesson_stats ON lesson_stats.lessonid = l.id AND lesson_stats.userid = lg.userid;
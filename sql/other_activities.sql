@@ -0,0 +1,40 @@
+-- Other Gradeable Activities with better filtering
+SELECT 
+    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
+    CAST(gg.userid AS CHAR(50)) as lms_la_lms_student_id,
+    CONCAT(COALESCE(gi.itemmodule, 'unknown'), '_', CAST(gi.iteminstance AS CHAR(20)), '_', CAST(gg.userid AS CHAR(20))) as lms_la_activity_id,
+    COALESCE(gi.itemmodule, 'unknown') as lms_la_activity_type,
+    COALESCE(gi.itemname, 'Unnamed Activity') as lms_la_title,
+    CASE 
+        WHEN cm.visible = 1 THEN 'published'
+        WHEN cm.visible = 0 THEN 'unpublished'
+        ELSE 'unknown'
+    END as lms_la_status,
+    CASE WHEN gi.timecreated > 0 THEN FROM_UNIXTIME(gi.timecreated) ELSE NULL END as lms_la_published_date,
+    NULL as lms_la_unlocked_date,
+    NULL as lms_la_locked_date,
+    NULL as lms_la_due_date,
+    NULL as lms_la_time_limit,
+    NULL as lms_la_scoring_policy,
+    gi.grademax as lms_la_points_possible,
+    NULL as lms_la_allowed_attempts,
+    gg.id as lms_la_result_id,
+    gg.finalgrade as lms_la_score,
+    gg.finalgrade as lms_la_kept_score,
+    1 as lms_la_attempt,
+    CASE WHEN gg.timemodified > 0 THEN FROM_UNIXTIME(gg.timemodified) ELSE NULL END as lms_la_grade_viewable,
+    NULL as lms_la_has_seen_results,
+    1 as lms_la_total_attempts,
+    CASE WHEN gg.timecreated > 0 THEN FROM_UNIXTIME(gg.timecreated) ELSE NULL END as lms_la_started_date,
+    CASE WHEN gg.timemodified > 0 THEN FROM_UNIXTIME(gg.timemodified) ELSE NULL END as lms_la_finished_date,
+    NULL as lms_la_time_taken
+FROM mdl_grade_items gi
+JOIN mdl_grade_grades gg ON gg.itemid = gi.id
+JOIN mdl_course c ON c.id = gi.courseid
+LEFT JOIN mdl_course_modules cm ON cm.instance = gi.iteminstance 
+LEFT JOIN mdl_modules m ON m.id = cm.module AND m.name = gi.itemmodule
+WHERE gi.itemtype = 'mod' 
+  AND gi.itemmodule IS NOT NULL
+  AND gi.itemmodule NOT IN ('assign', 'quiz', 'lesson', 'h5pactivity', 'scorm') 
+  AND gg.finalgrade IS NOT NULL
+  AND gg.finalgrade > 0;
@@ -0,0 +1,59 @@
+-- Quiz Activities with optimized subqueries
+SELECT 
+    CAST(c.id AS CHAR(50)) as lms_la_lms_course_id,
+    CAST(qa.userid AS CHAR(50)) as lms_la_lms_student_id,
+    CONCAT('quiz_', CAST(q.id AS CHAR(20)), '_', CAST(qa.attempt AS CHAR(10))) as lms_la_activity_id,
+    'quiz' as lms_la_activity_type,
+    q.name as lms_la_title,
+    CASE 
+        WHEN cm.visible = 1 THEN 'published'
+        WHEN cm.visible = 0 THEN 'unpublished'
+        ELSE 'unknown'
+    END as lms_la_status,
+    CASE WHEN q.timecreated > 0 THEN FROM_UNIXTIME(q.timecreated) ELSE NULL END as lms_la_published_date,
+    CASE WHEN q.timeopen > 0 THEN FROM_UNIXTIME(q.timeopen) ELSE NULL END as lms_la_unlocked_date,
+    CASE WHEN q.timeclose > 0 THEN FROM_UNIXTIME(q.timeclose) ELSE NULL END as lms_la_locked_date,
+    CASE WHEN q.timeclose > 0 THEN FROM_UNIXTIME(q.timeclose) ELSE NULL END as lms_la_due_date,
+    CASE WHEN q.timelimit > 0 THEN ROUND(q.timelimit / 60.0, 2) ELSE NULL END as lms_la_time_limit,
+    CASE 
+        WHEN q.grademethod = 1 THEN 'highest'
+        WHEN q.grademethod = 2 THEN 'average'
+        WHEN q.grademethod = 3 THEN 'first'
+        WHEN q.grademethod = 4 THEN 'last'
+        ELSE 'highest'
+    END as lms_la_scoring_policy,
+    q.grade as lms_la_points_possible,
+    CASE WHEN q.attempts = 0 THEN NULL ELSE q.attempts END as lms_la_allowed_attempts,
+    qa.id as lms_la_result_id,
+    qa.sumgrades as lms_la_score,
+    qa_stats.kept_score as lms_la_kept_score,
+    qa.attempt as lms_la_attempt,
+    CASE WHEN qa.timefinish > 0 THEN FROM_UNIXTIME(qa.timefinish) ELSE NULL END as lms_la_grade_viewable,
+    NULL as lms_la_has_seen_results,
+    qa_stats.total_attempts as lms_la_total_attempts,
+    CASE WHEN qa.timestart > 0 THEN FROM_UNIXTIME(qa.timestart) ELSE NULL END as lms_la_started_date,
+    CASE WHEN qa.timefinish > 0 THEN FROM_UNIXTIME(qa.timefinish) ELSE NULL END as lms_la_finished_date,
+    CASE 
+        WHEN qa.timestart > 0 AND qa.timefinish > qa.timestart 
+        THEN ROUND((qa.timefinish - qa.timestart) / 60.0, 2)
+        ELSE NULL 
+    END as lms_la_time_taken
+FROM mdl_quiz q
+JOIN mdl_course_modules cm ON cm.instance = q.id
+JOIN mdl_modules m ON m.id = cm.module AND m.name = 'quiz'
+JOIN mdl_course c ON c.id = q.course
+JOIN mdl_quiz_attempts qa ON qa.quiz = q.id AND qa.state = 'finished'
+LEFT JOIN (
+    SELECT qa2.quiz, qa2.userid, COUNT(*) as total_attempts,
+           CASE 
+               WHEN MAX(CASE WHEN q2.grademethod = 1 THEN qa2.sumgrades END) IS NOT NULL THEN MAX(qa2.sumgrades)
+               WHEN MAX(CASE WHEN q2.grademethod = 2 THEN qa2.sumgrades END) IS NOT NULL THEN AVG(qa2.sumgrades)
+               WHEN MAX(CASE WHEN q2.grademethod = 3 THEN qa2.sumgrades END) IS NOT NULL THEN MIN(qa2.sumgrades)
+               WHEN MAX(CASE WHEN q2.grademethod = 4 THEN qa2.sumgrades END) IS NOT NULL THEN MAX(qa2.sumgrades)
+               ELSE MAX(qa2.sumgrades)
+           END as kept_score
+    FROM mdl_quiz_attempts qa2
+    JOIN mdl_quiz q2 ON q2.id = qa2.quiz
+    WHERE qa2.state = 'finished'
+    GROUP BY qa2.quiz, qa2.userid
+) qa_stats ON qa_stats.quiz = q.id AND qa_stats.userid = qa.userid;
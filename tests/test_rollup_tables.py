@@ -0,0 +1,196 @@
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("prefect")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import moodle_learning_activities_flow as pipeline  # noqa: E402
+
+
+def make_record(activity_id, student_id, course_id, activity_type, score, attempt, finished=True):
+    return {
+        'lms_la_activity_id': activity_id,
+        'lms_la_lms_student_id': student_id,
+        'lms_la_lms_course_id': course_id,
+        'lms_la_activity_type': activity_type,
+        'lms_la_score': score,
+        'lms_la_attempt': attempt,
+        'lms_la_finished_date': '2025-01-01T00:00:00' if finished else None,
+    }
+
+
+def recompute_rollups(records):
+    """Aggregate the records from scratch, keeping the last record per (activity, student) key"""
+    facts = {(r['lms_la_activity_id'], r['lms_la_lms_student_id']): r for r in records}.values()
+    courses, students, activity_types = {}, {}, {}
+    for r in facts:
+        course = courses.setdefault(r['lms_la_lms_course_id'], [0, 0.0, 0])
+        course[0] += 1
+        if r['lms_la_score'] is not None:
+            course[1] += r['lms_la_score']
+            course[2] += 1
+        student = students.setdefault((r['lms_la_lms_student_id'], r['lms_la_activity_type']), [0, 0])
+        student[0] += 1
+        student[1] += int(r['lms_la_finished_date'] is not None)
+        activity_type = activity_types.setdefault(r['lms_la_activity_type'], [0, 0])
+        activity_type[0] += 1
+        activity_type[1] += r['lms_la_attempt']
+    return {
+        "course": {k: (v[0], v[1], v[2]) for k, v in courses.items()},
+        "student": {k: tuple(v) for k, v in students.items()},
+        "activity_type": {k: tuple(v) for k, v in activity_types.items()},
+    }
+
+
+def read_rollups(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            "course": {row[0]: tuple(row[1:]) for row in conn.execute(
+                "SELECT course_id, activity_count, score_sum, score_count FROM course_rollup")},
+            "student": {(row[0], row[1]): tuple(row[2:]) for row in conn.execute(
+                "SELECT student_id, activity_type, activity_count, completed_count FROM student_rollup")},
+            "activity_type": {row[0]: tuple(row[1:]) for row in conn.execute(
+                "SELECT activity_type, activity_count, attempt_sum FROM activity_type_rollup")},
+        }
+    finally:
+        conn.close()
+
+
+def apply(db_path, records):
+    conn = pipeline.connect_rollup_store(db_path)
+    try:
+        return pipeline.apply_rollup_update(conn, records)
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def records():
+    return [
+        make_record('quiz_1_1', 's1', 'c1', 'quiz', 8.0, 1),
+        make_record('quiz_1_2', 's1', 'c1', 'quiz', 9.5, 2),
+        make_record('quiz_1_1', 's2', 'c1', 'quiz', None, 1, finished=False),
+        make_record('assign_7_0', 's2', 'c2', 'assignment', 70.0, 1),
+        make_record('assign_7_0', 's3', 'c2', 'assignment', 55.0, 1),
+    ]
+
+
+def test_first_run_matches_full_recompute(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+
+    counts = apply(db_path, records)
+
+    assert counts == {"changed_rows": 5, "unchanged_rows": 0, "removed_rows": 0}
+    assert read_rollups(db_path) == recompute_rollups(records)
+
+
+def test_unchanged_rerun_applies_no_deltas(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    apply(db_path, records)
+
+    counts = apply(db_path, records)
+
+    assert counts == {"changed_rows": 0, "unchanged_rows": 5, "removed_rows": 0}
+    assert read_rollups(db_path) == recompute_rollups(records)
+
+
+def test_changed_row_moves_its_contribution(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    apply(db_path, records)
+    records[3] = make_record('assign_7_0', 's2', 'c3', 'assignment', 40.0, 2)
+
+    counts = apply(db_path, records)
+
+    assert counts == {"changed_rows": 1, "unchanged_rows": 4, "removed_rows": 0}
+    assert read_rollups(db_path) == recompute_rollups(records)
+
+
+def test_removed_row_is_retracted(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    apply(db_path, records)
+    remaining = records[:3] + records[4:]
+
+    counts = apply(db_path, remaining)
+
+    assert counts == {"changed_rows": 0, "unchanged_rows": 4, "removed_rows": 1}
+    assert read_rollups(db_path) == recompute_rollups(remaining)
+
+
+def test_skipped_and_collapsed_rows_are_not_counted_as_unchanged(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    duplicated = records + [records[0], make_record(None, 's9', 'c9', 'quiz', 1.0, 1)]
+
+    counts = apply(db_path, duplicated)
+
+    assert counts == {"changed_rows": 5, "unchanged_rows": 0, "removed_rows": 0}
+
+
+def test_concurrent_updaters_both_apply(tmp_path):
+    db_path = str(tmp_path / "rollups.db")
+    batches = [
+        [make_record(f'quiz_{i}_1', f's{worker}', 'c1', 'quiz', 1.0, 1) for i in range(20000)]
+        for worker in range(2)
+    ]
+    barrier = threading.Barrier(len(batches))
+    results, errors = [], []
+
+    def update(batch):
+        conn = pipeline.connect_rollup_store(db_path)
+        try:
+            barrier.wait()
+            results.append(pipeline.apply_rollup_update(conn, batch, full_extraction=False))
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=update, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(result["changed_rows"] for result in results) == [20000, 20000]
+    assert read_rollups(db_path) == recompute_rollups(batches[0] + batches[1])
+
+
+def test_failed_update_rolls_back_staging(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    conn = pipeline.connect_rollup_store(db_path)
+    try:
+        with pytest.raises(ValueError):
+            pipeline.apply_rollup_update(conn, records + [make_record('quiz_9_1', 's9', 'c9', 'quiz', 'n/a', 1)])
+
+        counts = pipeline.apply_rollup_update(conn, records)
+    finally:
+        conn.close()
+
+    assert counts == {"changed_rows": 5, "unchanged_rows": 0, "removed_rows": 0}
+    assert read_rollups(db_path) == recompute_rollups(records)
+
+
+def test_reads_do_not_create_a_missing_store(tmp_path):
+    db_path = tmp_path / "typo.db"
+
+    with pytest.raises(sqlite3.OperationalError):
+        pipeline.get_course_rollup('c1', str(db_path))
+
+    assert not db_path.exists()
+
+
+def test_reads_use_rollup_lookups(tmp_path, records):
+    db_path = str(tmp_path / "rollups.db")
+    apply(db_path, records)
+
+    assert pipeline.get_course_rollup('c2', db_path)['average_score'] == pytest.approx(62.5)
+    assert pipeline.get_student_rollup('s2', db_path) == {
+        'assignment': {"activity_count": 1, "completed_count": 1},
+        'quiz': {"activity_count": 1, "completed_count": 0},
+    }
+    assert pipeline.get_activity_type_rollup('quiz', db_path)['average_attempts'] == pytest.approx(4 / 3)
@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("prefect")
+pytest.importorskip("pandas")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import moodle_learning_activities_flow as pipeline  # noqa: E402
+
+
+def make_record(activity_id='quiz_1_1', student_id='s1', **overrides):
+    record = {
+        'lms_la_activity_id': activity_id,
+        'lms_la_lms_student_id': student_id,
+        'lms_la_lms_course_id': 'c1',
+        'lms_la_title': 'Quiz 1',
+        'lms_la_score': 8.0,
+        'lms_la_points_possible': 10,
+        'lms_la_attempt': 1,
+        'lms_la_total_attempts': 1,
+        'lms_la_started_date': '2025-01-01T10:00:00',
+        'lms_la_finished_date': '2025-01-01T11:00:00',
+    }
+    record.update(overrides)
+    return record
+
+
+def validate(records, **kwargs):
+    return pipeline.evaluate_validation_rules(records, 'quizzes', **kwargs)
+
+
+def test_clean_records_have_no_violations():
+    result = validate([make_record('quiz_1_1', 's1'), make_record('quiz_1_1', 's2')])
+
+    assert result['rows_validated'] == 2
+    assert set(result['rule_counts'].values()) == {0}
+
+
+def test_duplicates_are_detected_across_batch_boundaries():
+    records = [
+        make_record('quiz_1_1', 's1'),
+        make_record('quiz_1_1', 's2'),
+        make_record('quiz_1_2', 's1'),
+        make_record('quiz_1_1', 's1'),
+        make_record('quiz_1_2', 's1'),
+    ]
+
+    result = validate(records, batch_size=2)
+
+    assert result['rule_counts']['duplicate_activity_student'] == 2
+    assert result['duplicate_activity_ids'] == 3
+
+
+def test_orphan_course_ids_without_known_courses_only_flags_missing_ids():
+    records = [make_record(lms_la_lms_course_id=None), make_record('quiz_1_2', lms_la_lms_course_id='c9')]
+
+    result = validate(records)
+
+    assert result['rule_counts']['orphan_course_id'] == 1
+
+
+def test_orphan_course_ids_with_known_courses_flags_unknown_ids():
+    records = [
+        make_record(lms_la_lms_course_id=None),
+        make_record('quiz_1_2', lms_la_lms_course_id='c9'),
+        make_record('quiz_1_3', lms_la_lms_course_id='c1'),
+    ]
+
+    result = validate(records, known_course_ids=['c1'])
+
+    assert result['rule_counts']['orphan_course_id'] == 2
+
+
+@pytest.mark.parametrize("rule_name, overrides", [
+    ("finished_before_started", {'lms_la_finished_date': '2025-01-01T09:00:00'}),
+    ("score_above_points_possible", {'lms_la_score': 12.5}),
+    ("attempt_above_total_attempts", {'lms_la_attempt': 3, 'lms_la_total_attempts': 2}),
+])
+def test_row_level_rules(rule_name, overrides):
+    records = [make_record('quiz_1_1'), make_record('quiz_1_2', **overrides)]
+
+    result = validate(records)
+
+    assert result['rule_counts'][rule_name] == 1
+    assert result['samples'][rule_name][0]['lms_la_activity_id'] == 'quiz_1_2'
+
+
+def test_mixed_timezone_offsets_do_not_fail_validation():
+    records = [
+        make_record('quiz_1_1'),
+        make_record('quiz_1_2', lms_la_started_date='2025-01-01T10:00:00+00:00',
+                    lms_la_finished_date='2025-01-01T09:00:00+00:00'),
+    ]
+
+    result = validate(records)
+
+    assert result['rule_counts']['finished_before_started'] == 1
+
+
+def test_samples_are_capped_across_batches():
+    records = [make_record(f'quiz_1_{i}', lms_la_score=None) for i in range(10)]
+
+    result = validate(records, batch_size=4, sample_size=3)
+
+    assert result['rule_counts']['null_score'] == 10
+    assert len(result['samples']['null_score']) == 3
+
+
+def test_empty_input():
+    result = validate([])
+
+    assert result['rows_validated'] == 0
+    assert result['duplicate_activity_ids'] == 0
+    assert set(result['rule_counts'].values()) == {0}
+    assert all(samples == [] for samples in result['samples'].values())